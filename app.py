@@ -16,7 +16,10 @@ from werkzeug.utils import secure_filename
 from PIL import Image, ImageFilter, ImageEnhance, ImageOps
 import pytesseract
 import difflib
-from functools import wraps
+import math
+import re
+from functools import lru_cache, wraps
+from collections import deque
 from datetime import datetime
 
 app = Flask(__name__)
@@ -181,17 +184,160 @@ def ocr_extract(image_path):
 def calculate_similarity(a, b):
     return difflib.SequenceMatcher(None, (a or "").lower(), (b or "").lower()).ratio() if a is not None and b is not None else 0.0
 
-def load_answer_key(file_path):
+KEYWORD_WEIGHT = 0.6
+SIMILARITY_WEIGHT = 0.4
+PASS_THRESHOLD = 0.6
+WORD_MATCH_CUTOFF = 0.8
+STOPWORDS = frozenset(
+    "a an the is are was were be been being of in on at to for from by with and or but "
+    "not it its this that these those as which who what when where how".split()
+)
+DEFAULT_MAX_MARKS = 100
+GRADE_BOUNDARIES = [(90, "A+"), (80, "A"), (70, "B"), (60, "C"), (50, "D")]
+
+ANSWER_KEY_CACHE_SIZE = 32
+
+def _to_number(value, default, positive=False):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not math.isfinite(number) or (positive and number <= 0):
+        return default
+    return number
+
+def _split_terms(value, sep=";"):
+    return [t.strip().lower() for t in (value or "").split(sep) if t.strip()]
+
+def parse_synonyms(value, keywords):
+    # "keyword=alt one|alt two;other=alt three". An alternative that is itself
+    # one of the keywords only credits that keyword, so it is left out here.
+    synonyms = {}
+    for entry in _split_terms(value):
+        if "=" not in entry:
+            continue
+        keyword, alts = entry.split("=", 1)
+        keyword = keyword.strip()
+        if keyword not in keywords:
+            print(f"Answer key warning: synonyms for unknown keyword '{keyword}' ignored")
+            continue
+        alts = [a for a in _split_terms(alts, "|") if a not in keywords]
+        synonyms.setdefault(keyword, []).extend(alts)
+    return {k: list(dict.fromkeys(v)) for k, v in synonyms.items()}
+
+def compile_keyword_matcher(keywords, synonyms):
+    # Aho-Corasick automaton over every keyword and synonym, so a single pass over
+    # an answer finds all hits, including overlapping ones ("cell" / "cell wall").
+    if not keywords:
+        return None
+    goto, fail, output = [{}], [0], [[]]
+    for i, keyword in enumerate(keywords):
+        for term in {keyword, *synonyms.get(keyword, [])}:
+            term = " ".join(term.split())
+            state = 0
+            for ch in term:
+                if ch not in goto[state]:
+                    goto.append({})
+                    fail.append(0)
+                    output.append([])
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            # only a term edge that is a word character needs a word boundary there
+            output[state].append((len(term), i, _is_word_char(term[0]), _is_word_char(term[-1])))
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, nxt in goto[state].items():
+            queue.append(nxt)
+            f = fail[state]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(ch, 0)
+            output[nxt] = output[nxt] + output[fail[nxt]]
+    return {"goto": goto, "fail": fail, "output": output}
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+def _is_whole_word(text, start, end, check_start, check_end):
+    return ((not check_start or start == 0 or not _is_word_char(text[start - 1]))
+            and (not check_end or end == len(text) or not _is_word_char(text[end])))
+
+def match_keywords(matcher, keywords, text):
+    if matcher is None or not text:
+        return []
+    goto, fail, output = matcher["goto"], matcher["fail"], matcher["output"]
+    text = " ".join(text.lower().split())
+    found = set()
+    state = 0
+    for end, ch in enumerate(text, 1):
+        while state and ch not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(ch, 0)
+        for length, i, check_start, check_end in output[state]:
+            if i not in found and _is_whole_word(text, end - length, end, check_start, check_end):
+                found.add(i)
+        if len(found) == len(keywords):
+            break
+    return [keywords[i] for i in sorted(found)]
+
+def build_question(row):
+    keywords = list(dict.fromkeys(_split_terms(row.get("keywords"))))
+    synonyms = parse_synonyms(row.get("synonyms"), keywords)
+    return {
+        "question": row["question"],
+        "answer": row.get("answer", ""),
+        "weight": _to_number(row.get("weight"), 1.0, positive=True),
+        "max_marks": _to_number(row.get("max_marks"), DEFAULT_MAX_MARKS, positive=True),
+        # "-0.5" and "0.5" both mean half a mark is taken off
+        "negative_marks": abs(_to_number(row.get("negative_marks"), 0.0)),
+        "keywords": keywords,
+        "synonyms": synonyms,
+        "matcher": compile_keyword_matcher(keywords, synonyms)
+    }
+
+@lru_cache(maxsize=ANSWER_KEY_CACHE_SIZE)
+def _read_answer_key(file_path, mtime):
+    # mtime is part of the cache key, so an edited key file is parsed again
     key = []
-    if not file_path or not os.path.exists(file_path):
-        return key
     with open(file_path, newline='', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
             if not row.get("question"):
                 continue
-            key.append({"question": row["question"], "answer": row.get("answer", "")})
-    return key
+            key.append(build_question(row))
+    return tuple(key)
+
+def load_answer_key(file_path):
+    if not file_path or not os.path.exists(file_path):
+        return []
+    # Questions are copied out of the cache; their keyword lists, synonyms and
+    # matcher are still shared and must not be mutated by callers.
+    return [dict(q) for q in _read_answer_key(file_path, os.path.getmtime(file_path))]
+
+def question_max_marks(q):
+    return q.get("max_marks", DEFAULT_MAX_MARKS) * q.get("weight", 1.0)
+
+def grade_for_percentage(percentage):
+    for cutoff, grade in GRADE_BOUNDARIES:
+        if percentage >= cutoff:
+            return grade
+    return "F"
+
+def _content_words(text):
+    return {w for w in re.findall(r"\w+", (text or "").lower()) if w not in STOPWORDS}
+
+def shares_reference_word(student_ans, reference):
+    # close matches count too, so an OCR slip like "Pari" for "Paris" is not wrong
+    reference_words = list(_content_words(reference))
+    return any(difflib.get_close_matches(w, reference_words, n=1, cutoff=WORD_MATCH_CUTOFF)
+               for w in _content_words(student_ans))
+
+def is_wrong_answer(student_ans, reference, matched):
+    # Negative marks are for attempted answers with nothing right in them: no
+    # keyword and no content word of the reference answer. Character similarity
+    # is no use here, since unrelated sentences still share many letters.
+    return bool(student_ans) and not matched and not shares_reference_word(student_ans, reference)
 
 def evaluate_answer(extracted_answers, answer_key):
     results = []
@@ -199,17 +345,36 @@ def evaluate_answer(extracted_answers, answer_key):
     for q in answer_key:
         student_ans = extracted_answers.get(q["question"], "")
         sim = calculate_similarity(student_ans, q["answer"])
-        marks = int(sim * 100)
-        remarks = "Excellent" if marks > 80 else "Good" if marks > 60 else "Needs Improvement"
+        keywords = q.get("keywords", [])
+        matched = match_keywords(q.get("matcher"), keywords, student_ans)
+        if keywords:
+            score = KEYWORD_WEIGHT * len(matched) / len(keywords) + SIMILARITY_WEIGHT * sim
+        else:
+            score = sim
+        if q.get("negative_marks") and is_wrong_answer(student_ans, q["answer"], matched):
+            marks = -q["negative_marks"] * q.get("weight", 1.0)
+        else:
+            marks = score * question_max_marks(q)
+        marks = round(marks, 2)
+        remarks = "Excellent" if score > 0.8 else "Good" if score > PASS_THRESHOLD else "Needs Improvement"
         results.append({
             "question": q["question"],
             "extracted": student_ans,
             "marks": marks,
+            "max_marks": round(question_max_marks(q), 2),
             "similarity": round(sim * 100, 2),
+            "matched_keywords": matched,
             "remarks": remarks
         })
         total_marks += marks
-    return results, total_marks
+    return results, round(total_marks, 2)
+
+def _parse_marks(value):
+    try:
+        marks = float(value)
+    except (TypeError, ValueError):
+        return 0
+    return marks if math.isfinite(marks) else 0
 
 def save_student_results(student_name, evaluated_answers):
     student_id = 1
@@ -257,10 +422,7 @@ def load_results():
             if sid not in students:
                 students[sid] = {"name": row.get("name", ""), "answers": []}
             row_copy = dict(row)
-            try:
-                row_copy["marks"] = int(row_copy.get("marks", 0))
-            except Exception:
-                row_copy["marks"] = 0
+            row_copy["marks"] = _parse_marks(row_copy.get("marks", 0))
             students[sid]["answers"].append(row_copy)
     return students
 
@@ -411,7 +573,7 @@ def admin_results():
     
 
     for s in students.values():
-        s['total_marks'] = sum(int(a.get('marks', 0)) for a in s.get('answers', []))
+        s['total_marks'] = sum(_parse_marks(a.get('marks', 0)) for a in s.get('answers', []))
 
    
     marks_map = {s['name']: s['total_marks'] for s in students.values()}
@@ -520,6 +682,8 @@ def evaluator_evaluate(submission_id):
         for i, q in enumerate(answer_key):
             extracted_answers[q["question"]] = lines[i] if i < len(lines) else ""
         evaluated, total_marks = evaluate_answer(extracted_answers, answer_key)
+        max_total = sum(question_max_marks(q) for q in answer_key)
+        percentage = round(total_marks / max_total * 100, 2) if max_total else 0.0
 
       
         return render_template(
@@ -527,6 +691,9 @@ def evaluator_evaluate(submission_id):
             student_name=submission.student_username,
             evaluated=evaluated,
             total_marks=total_marks,
+            max_total=round(max_total, 2),
+            percentage=percentage,
+            grade=grade_for_percentage(percentage),
             image_file=submission.filename,
             submission_id=submission.id,
             exam=exam,
@@ -553,7 +720,7 @@ def save_results():
             evaluated.append({
                 "question": q,
                 "extracted": extracted_list[i] if i < len(extracted_list) else "",
-                "marks": int(marks_list[i]) if i < len(marks_list) and str(marks_list[i]).isdigit() else 0,
+                "marks": _parse_marks(marks_list[i]) if i < len(marks_list) else 0,
                 "similarity": float(similarity_list[i]) if i < len(similarity_list) and similarity_list[i] else 0.0,
                 "remarks": remarks_list[i] if i < len(remarks_list) else ""
             })
@@ -622,7 +789,7 @@ def student_results():
 def analytics():
     students = load_results()  
     labels = [s.get("name", "Unknown") for s in students.values()]
-    marks  = [sum(int(a.get("marks", 0)) for a in s.get("answers", [])) for s in students.values()]
+    marks  = [sum(_parse_marks(a.get("marks", 0)) for a in s.get("answers", [])) for s in students.values()]
 
     
     plt.figure(figsize=(10,6))
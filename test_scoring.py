@@ -0,0 +1,198 @@
+import os
+
+import pytest
+
+import app
+
+
+def _question(answer, keywords="", synonyms="", **rubric):
+    row = {"question": "Q1", "answer": answer, "keywords": keywords, "synonyms": synonyms}
+    row.update({k: str(v) for k, v in rubric.items()})
+    return app.build_question(row)
+
+
+def _match(q, text):
+    return app.match_keywords(q["matcher"], q["keywords"], text)
+
+
+def test_parse_synonyms():
+    assert app.parse_synonyms("sunlight=Light Energy|solar energy;bad entry", ["sunlight"]) == {
+        "sunlight": ["light energy", "solar energy"]
+    }
+    assert app.parse_synonyms("", ["sunlight"]) == {}
+
+
+def test_parse_synonyms_warns_about_unknown_keyword(capsys):
+    synonyms = app.parse_synonyms("sunlite=light energy;sunlight=solar energy", ["sunlight"])
+    assert synonyms == {"sunlight": ["solar energy"]}
+    assert "unknown keyword 'sunlite'" in capsys.readouterr().out
+
+
+def test_parse_synonyms_drops_alternatives_that_are_keywords():
+    synonyms = app.parse_synonyms("sunlight=light energy|solar energy|solar energy", ["sunlight", "light energy"])
+    assert synonyms == {"sunlight": ["solar energy"]}
+
+
+def test_match_keywords_is_case_and_whitespace_insensitive():
+    q = _question("", "light energy;c++")
+    assert _match(q, "LIGHT\n  energy and C++") == ["light energy", "c++"]
+    assert _match(q, "lightenergy") == []
+
+
+def test_match_keywords_requires_whole_words():
+    q = _question("", "cell")
+    assert _match(q, "cellular respiration") == []
+    assert _match(q, "a cell.") == ["cell"]
+
+
+def test_match_keywords_with_punctuation_at_term_edges():
+    q = _question("", ".net;c++")
+    assert _match(q, "asp.net and c++") == [".net", "c++"]
+    assert _match(q, "asp.network") == []
+
+
+def test_match_keywords_credits_prefix_keywords():
+    q = _question("", "cell;cell wall")
+    assert _match(q, "the cell wall is rigid") == ["cell", "cell wall"]
+
+
+def test_match_keywords_credits_overlapping_synonym():
+    q = _question("", "photosynthesis;sunlight;energy", "sunlight=light energy")
+    assert _match(q, "uses light energy") == ["sunlight", "energy"]
+
+
+def test_match_keywords_finds_term_inside_longer_partial_term():
+    q = _question("", "new york city;york")
+    assert _match(q, "from new york") == ["york"]
+
+
+def test_duplicate_keywords_do_not_reduce_coverage():
+    q = _question("", "a;a;b")
+    assert q["keywords"] == ["a", "b"]
+    assert _match(q, "a b") == ["a", "b"]
+
+
+def test_evaluate_answer_without_keywords_uses_similarity():
+    results, total = app.evaluate_answer({"Q1": "Paris"}, [_question("Paris")])
+    assert results[0]["marks"] == 100
+    assert results[0]["max_marks"] == 100
+    assert results[0]["remarks"] == "Excellent"
+    assert total == 100
+
+
+def test_evaluate_answer_with_keywords_and_weight():
+    q = _question("plants use sunlight", "sunlight;chlorophyll", weight=2, max_marks=5)
+    results, total = app.evaluate_answer({"Q1": "plants use sunlight"}, [q])
+    # half the keywords (0.6 * 0.5) plus full similarity (0.4 * 1.0), out of 10
+    assert results[0]["marks"] == pytest.approx(7.0)
+    assert results[0]["max_marks"] == 10
+    assert results[0]["matched_keywords"] == ["sunlight"]
+    assert total == pytest.approx(7.0)
+
+
+def test_negative_marks_for_wrong_answer():
+    q = _question("Paris", max_marks=1, negative_marks=0.25, weight=2)
+    results, total = app.evaluate_answer({"Q1": "London"}, [q])
+    assert results[0]["marks"] == -0.5
+    assert total == -0.5
+
+
+@pytest.mark.parametrize("reference, answer", [
+    ("Paris", "Rome is the capital"),
+    ("Plants make food using sunlight", "water boils at one hundred degrees"),
+])
+def test_negative_marks_for_wrong_sentence_answer(reference, answer):
+    q = _question(reference, max_marks=1, negative_marks=0.25)
+    results, _ = app.evaluate_answer({"Q1": answer}, [q])
+    assert results[0]["marks"] == -0.25
+
+
+@pytest.mark.parametrize("reference, answer", [
+    ("Paris", "Pari"),
+    ("Plants make food using sunlight", "Plants need water to grow"),
+])
+def test_no_negative_marks_for_near_miss_or_partly_right_answer(reference, answer):
+    q = _question(reference, max_marks=1, negative_marks=0.25)
+    results, _ = app.evaluate_answer({"Q1": answer}, [q])
+    assert results[0]["marks"] > 0
+
+
+def test_negative_marks_written_as_negative_number():
+    q = _question("Paris", max_marks=1, negative_marks=-0.5)
+    assert q["negative_marks"] == 0.5
+    results, _ = app.evaluate_answer({"Q1": "London"}, [q])
+    assert results[0]["marks"] == -0.5
+
+
+@pytest.mark.parametrize("value", ["-2", "0", "nan", "inf", "abc", ""])
+def test_invalid_weight_and_max_marks_fall_back_to_defaults(value):
+    q = _question("Paris", weight=value, max_marks=value)
+    assert q["weight"] == 1
+    assert q["max_marks"] == app.DEFAULT_MAX_MARKS
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "abc", ""])
+def test_invalid_negative_marks_fall_back_to_zero(value):
+    assert _question("Paris", negative_marks=value)["negative_marks"] == 0
+
+
+def test_negative_marks_keep_partial_credit():
+    q = _question("chlorophyll absorbs light", "chlorophyll;stomata", max_marks=5, negative_marks=1)
+    results, _ = app.evaluate_answer({"Q1": "chlorophyll"}, [q])
+    assert results[0]["marks"] > 0
+
+
+def test_negative_marks_skip_blank_answers():
+    q = _question("Paris", max_marks=1, negative_marks=0.25)
+    results, _ = app.evaluate_answer({}, [q])
+    assert results[0]["marks"] == 0
+
+
+def test_grade_for_percentage():
+    assert app.grade_for_percentage(95) == "A+"
+    assert app.grade_for_percentage(80) == "A"
+    assert app.grade_for_percentage(72) == "B"
+    assert app.grade_for_percentage(50) == "D"
+    assert app.grade_for_percentage(49.99) == "F"
+
+
+def test_load_answer_key_reads_rubric_columns(tmp_path):
+    path = tmp_path / "key.csv"
+    path.write_text(
+        "question,answer,weight,max_marks,negative_marks,keywords,synonyms\n"
+        "Q1,Paris,2,5,0.5,paris;paris,paris=lutetia\n"
+        "Q2,Berlin,,,,,\n",
+        encoding="utf-8",
+    )
+    key = app.load_answer_key(str(path))
+    assert [q["question"] for q in key] == ["Q1", "Q2"]
+    assert (key[0]["weight"], key[0]["max_marks"], key[0]["negative_marks"]) == (2, 5, 0.5)
+    assert key[0]["keywords"] == ["paris"]
+    assert _match(key[0], "Lutetia") == ["paris"]
+    assert (key[1]["weight"], key[1]["max_marks"], key[1]["matcher"]) == (1, app.DEFAULT_MAX_MARKS, None)
+    again = app.load_answer_key(str(path))
+    assert again == key and again is not key
+    assert again[0]["matcher"] is key[0]["matcher"]
+    again[0]["weight"] = 10
+    assert app.load_answer_key(str(path))[0]["weight"] == 2
+
+
+def test_load_answer_key_rereads_edited_file(tmp_path):
+    path = tmp_path / "key.csv"
+    path.write_text("question,answer\nQ1,Paris\n", encoding="utf-8")
+    assert app.load_answer_key(str(path))[0]["answer"] == "Paris"
+    path.write_text("question,answer\nQ1,Rome\n", encoding="utf-8")
+    os.utime(path, (0, 12345))
+    assert app.load_answer_key(str(path))[0]["answer"] == "Rome"
+
+
+def test_load_answer_key_missing_file():
+    assert app.load_answer_key("no-such-key.csv") == []
+
+
+def test_parse_marks():
+    assert app._parse_marks("-0.25") == -0.25
+    assert app._parse_marks("7") == 7
+    assert app._parse_marks("") == 0
+    for value in ("nan", "inf", "-inf", "1e309"):
+        assert app._parse_marks(value) == 0